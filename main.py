@@ -1,7 +1,8 @@
 import os
-import ee
+from concurrent.futures import ProcessPoolExecutor
 from src.data_fetcher import fetch_metrics
 from src.chf_engine import CHFEngine
+from src.gee_utils import GEEUtils
 
 # ==========================================
 # CONFIGURATION
@@ -52,36 +53,54 @@ def get_dates_for_year(year, config_template):
     """Replaces YYYY in the date config with the specific year."""
     return {k: v.replace('YYYY', str(year)) for k, v in config_template.items()}
 
+def _run_year(args):
+    """Extracts one year's indicators in a worker process."""
+    year, position = args
+    print(f"Processing Year: {year}")
+
+    # Each worker process needs its own EE session.
+    GEEUtils.initialize(GEE_PROJECT)
+
+    dates = get_dates_for_year(year, DATES_CONFIG)
+
+    fetch_metrics(
+        year=year,
+        crop_map_asset=CROP_MAPS[year],
+        roi_asset_id=SHAPEFILE_ASSET,
+        output_dir=RAW_DATA_DIR,
+        dates_config=dates,
+        target_crop_class=TARGET_CROP_CLASS,
+        chunk_size=50,  # Adjust based on timeout risk
+        progress_position=position
+    )
+
 def main():
-    # Initialize Earth Engine
-    try:
-        ee.Initialize(project=GEE_PROJECT)
-        print(f"Successfully initialized GEE with project: {GEE_PROJECT}")
-    except Exception as e:
-        print("Warning: explicit project init failed. Trying default.")
-        ee.Initialize()
+    # Initialize Earth Engine (high-volume endpoint)
+    GEEUtils.initialize(GEE_PROJECT)
 
     # PHASE 1: DATA EXTRACTION
+    # Years are independent (own crop map, dates and output CSV), so they
+    # run in parallel worker processes; each worker re-initializes EE.
     if RUN_PHASE_1_EXTRACTION:
         print("\n--- PHASE 1: BATCH EXTRACTION ---")
-        for year in ALL_YEARS:
-            print(f"Processing Year: {year}")
 
+        years_to_run = []
+        for year in ALL_YEARS:
             if year not in CROP_MAPS:
                 print(f"Skipping {year}: No crop map defined.")
                 continue
+            years_to_run.append(year)
 
-            dates = get_dates_for_year(year, DATES_CONFIG)
+        if years_to_run:
+            with ProcessPoolExecutor(max_workers=len(years_to_run)) as executor:
+                list(executor.map(_run_year,
+                                  [(y, i) for i, y in enumerate(years_to_run)]))
 
-            fetch_metrics(
-                year=year,
-                crop_map_asset=CROP_MAPS[year],
-                roi_asset_id=SHAPEFILE_ASSET,
-                output_dir=RAW_DATA_DIR,
-                dates_config=dates,
-                target_crop_class=TARGET_CROP_CLASS,
-                chunk_size=50  # Adjust based on timeout risk
-            )
+    # Load indicator frames once and hand them to both modelling phases,
+    # so each year's file is parsed a single time per run.
+    indicator_frames = None
+    if RUN_PHASE_2_TRAINING or RUN_PHASE_3_SCORING:
+        indicator_frames = CHFEngine.load_indicators(ALL_YEARS, RAW_DATA_DIR)
 
     # PHASE 2: WEIGHT TRAINING
     if RUN_PHASE_2_TRAINING:
@@ -90,7 +109,8 @@ def main():
             CHFEngine.train_model(
                 training_years=TRAINING_YEARS,
                 input_dir=RAW_DATA_DIR,
-                output_dir=MODEL_DIR
+                output_dir=MODEL_DIR,
+                indicator_frames=indicator_frames
             )
         except Exception as e:
             print(f"Training failed: {e}")
@@ -103,7 +123,8 @@ def main():
                 years_list=ALL_YEARS,
                 input_dir=RAW_DATA_DIR,
                 model_dir=MODEL_DIR,
-                output_dir=RESULTS_DIR
+                output_dir=RESULTS_DIR,
+                indicator_frames=indicator_frames
             )
         except Exception as e:
             print(f"Scoring failed: {e}")
@@ -1,6 +1,283 @@
 import pandas as pd
 import numpy as np
 import os
+import json
+import math
+import functools
+
+# Numba is used for the entropy hot loop when available; the NumPy
+# reduceat path below remains as the fallback.
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+def _read_indicator_csv(filepath):
+    """
+    Reads an indicators CSV via Arrow's multithreaded parser.
+
+    engine='pyarrow' parses columns in parallel with SIMD, and the Arrow
+    dtype backend halves memory versus object-backed frames; downstream
+    groupby/to_numpy calls accept Arrow-backed Series transparently.
+    """
+    return pd.read_csv(filepath, engine='pyarrow', dtype_backend='pyarrow')
+
+
+def _downcast_indicators(df):
+    """
+    Downcasts the indicator columns to float32. Remote-sensing aggregates
+    don't need double precision, and halving the element size halves both
+    the frame footprint and the bytes moved through the compute kernels.
+    """
+    cols = [c for c in CHFEngine.ALL_INDICATORS if c in df.columns]
+    df[cols] = df[cols].astype(np.float32)
+    return df
+
+
+@functools.lru_cache(maxsize=None)
+def _load_indicator_file(filepath):
+    """
+    Cached path -> DataFrame loader for indicator files.
+
+    Within one process a year's indicators can be parsed by training,
+    scoring and the verification scripts; memoizing on the path bounds
+    that to a single parse per file. The cache holds the frame itself, so
+    callers must treat the result as read-only (the pipeline only reads
+    columns out of these frames).
+    """
+    if filepath.endswith('.parquet'):
+        return _downcast_indicators(
+            pd.read_parquet(filepath, dtype_backend='pyarrow'))
+    return _downcast_indicators(_read_indicator_csv(filepath))
+
+
+def _read_indicators(input_dir, year):
+    """
+    Loads one year's indicators, preferring the columnar Parquet copy
+    written by fetch_metrics over the CSV. Returns None if neither exists.
+    """
+    pq_path = os.path.join(input_dir, f'indicators_{year}.parquet')
+    if os.path.exists(pq_path):
+        return _load_indicator_file(pq_path)
+
+    csv_path = os.path.join(input_dir, f'indicators_{year}.csv')
+    if os.path.exists(csv_path):
+        return _load_indicator_file(csv_path)
+
+    return None
+
+
+def _fill_group_means(X, offsets_ext):
+    """
+    Fills NaNs in each contiguous group block with that group's column mean.
+
+    Single vectorized pass via np.add.reduceat: one scan for the sums, one
+    for the valid counts, one broadcasted fill. Groups with no valid values
+    keep their NaNs. X must be sorted so each group is contiguous.
+    """
+    offsets = offsets_ext[:-1]
+    counts = np.diff(offsets_ext)
+    group_idx = np.repeat(np.arange(len(offsets)), counts)
+
+    nan_mask = np.isnan(X)
+    # Accumulate the sums in float64 regardless of X's dtype, then cast the
+    # means back so the fill doesn't promote a float32 matrix.
+    sums = np.add.reduceat(np.where(nan_mask, 0.0, X), offsets, axis=0,
+                           dtype=np.float64)
+    valid = np.add.reduceat((~nan_mask).astype(np.float64), offsets, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_means = (sums / valid).astype(X.dtype)  # NaN where all invalid
+    return np.where(nan_mask, group_means[group_idx], X)
+
+
+def _entropy_weights_numpy(X, offsets_ext, positive):
+    """
+    Vectorized entropy-weight computation over contiguous strata blocks.
+
+    Args:
+        X (np.ndarray): (n_rows, n_indicators) float matrix, sorted so each
+            strata is one contiguous block. May contain NaNs.
+        offsets_ext (np.ndarray): Group start offsets with n_rows appended.
+        positive (np.ndarray): Bool mask, True for positive indicators.
+
+    Returns:
+        (weights, mins, maxs) arrays shaped (n_groups, n_indicators).
+    """
+    offsets = offsets_ext[:-1]
+    counts = np.diff(offsets_ext)
+    group_idx = np.repeat(np.arange(len(offsets)), counts)
+
+    # Handle Missing Data: Fill with the strata mean
+    X = _fill_group_means(X, offsets_ext)
+
+    # Min/Max per (strata, indicator)
+    mins = np.minimum.reduceat(X, offsets, axis=0)
+    maxs = np.maximum.reduceat(X, offsets, axis=0)
+    ranges = maxs - mins
+
+    # Normalize (positive indicators ascend, negative descend).
+    # Zero-variance or all-NaN groups are left at 0 here and get zero
+    # divergence below.
+    ranges_b = ranges[group_idx]
+    numer = np.where(positive, X - mins[group_idx], maxs[group_idx] - X)
+
+    normalized = np.zeros_like(X)
+    valid_range = ranges_b > 0  # False for zero variance and NaN
+    np.divide(numer, ranges_b, out=normalized, where=valid_range)
+
+    # Probability (Pij)
+    totals = np.add.reduceat(normalized, offsets, axis=0)
+    probs = np.zeros_like(X)
+    np.divide(normalized, totals[group_idx], out=probs, where=totals[group_idx] > 0)
+
+    # Entropy (Ej) — log only the positive entries (zeros are padded to 1.0,
+    # whose log is a clean 0), keeping the pass free of divide-by-zero
+    # warnings; the reduction accumulates in float64 for stability.
+    plogp = probs * np.log(np.where(probs > 0, probs, 1.0))
+    entropy_sums = np.add.reduceat(plogp, offsets, axis=0, dtype=np.float64)
+
+    k = np.where(counts > 1, 1.0 / np.log(np.maximum(counts, 2)), 0.0)
+    ej = -k[:, None] * entropy_sums
+
+    # Divergence (Dj), zeroed for the degenerate cases: zero variance,
+    # zero normalized total, or single-row strata.
+    dj = 1.0 - ej
+    invalid = ~((ranges > 0) & (totals > 0) & (counts[:, None] > 1))
+    dj[invalid] = 0.0
+
+    # Final Weights (wj)
+    total_divergence = dj.sum(axis=1)
+    weights = np.zeros_like(dj)
+    np.divide(dj, total_divergence[:, None], out=weights,
+              where=total_divergence[:, None] > 0)
+
+    return weights, mins, maxs
+
+
+if _HAS_NUMBA:
+    # No fastmath on these kernels: it licenses the compiler to assume no
+    # NaNs exist, which folds np.isnan to False and NaN comparisons to
+    # arbitrary branches — and missing values are a designed-for input here.
+    @njit(parallel=True, cache=True)
+    def _entropy_weights_numba(X, offsets_ext, positive):  # pragma: no cover
+        """
+        Fused entropy-weight kernel: one cache-friendly sweep per strata,
+        no intermediate (n_rows, n_indicators) temporaries.
+        """
+        n_groups = offsets_ext.shape[0] - 1
+        n_ind = X.shape[1]
+
+        weights = np.zeros((n_groups, n_ind))
+        mins = np.full((n_groups, n_ind), np.nan)
+        maxs = np.full((n_groups, n_ind), np.nan)
+
+        for g in prange(n_groups):
+            start = offsets_ext[g]
+            end = offsets_ext[g + 1]
+            n = end - start
+
+            dj = np.zeros(n_ind)
+
+            for j in range(n_ind):
+                # Pass 1: mean/min/max over valid values
+                total = 0.0
+                cnt = 0
+                mn = np.inf
+                mx = -np.inf
+                for i in range(start, end):
+                    v = X[i, j]
+                    if not np.isnan(v):
+                        total += v
+                        cnt += 1
+                        if v < mn:
+                            mn = v
+                        if v > mx:
+                            mx = v
+
+                if cnt == 0:
+                    continue  # all-NaN group: NaN scaling, zero divergence
+
+                mins[g, j] = mn
+                maxs[g, j] = mx
+                rng = mx - mn
+
+                if rng <= 0.0 or n <= 1:
+                    continue  # zero variance or single row
+
+                mean = total / cnt
+
+                # Pass 2: normalized total (NaNs filled with the mean)
+                norm_total = 0.0
+                for i in range(start, end):
+                    v = X[i, j]
+                    if np.isnan(v):
+                        v = mean
+                    if positive[j]:
+                        norm_total += (v - mn) / rng
+                    else:
+                        norm_total += (mx - v) / rng
+
+                if norm_total <= 0.0:
+                    continue
+
+                # Pass 3: entropy of the probability distribution
+                entropy = 0.0
+                for i in range(start, end):
+                    v = X[i, j]
+                    if np.isnan(v):
+                        v = mean
+                    if positive[j]:
+                        p = ((v - mn) / rng) / norm_total
+                    else:
+                        p = ((mx - v) / rng) / norm_total
+                    if p > 0.0:
+                        entropy += p * math.log(p)
+
+                ej = -entropy / math.log(n)
+                dj[j] = 1.0 - ej
+
+            total_divergence = dj.sum()
+            if total_divergence > 0.0:
+                for j in range(n_ind):
+                    weights[g, j] = dj[j] / total_divergence
+
+        return weights, mins, maxs
+
+    @njit(parallel=True, cache=True)
+    def _score_rows_numba(X, strata_idx, W, MN, MX, positive):  # pragma: no cover
+        """
+        Fused scoring kernel: normalize and weight-sum each unit row in one
+        sweep, indexing the model matrices by the unit's strata row instead
+        of expanding them to (n_units, n_indicators) first.
+        """
+        n_rows, n_ind = X.shape
+        out = np.empty(n_rows, dtype=np.float32)
+
+        for i in prange(n_rows):
+            s = strata_idx[i]
+            acc = 0.0
+            for j in range(n_ind):
+                mn = MN[s, j]
+                mx = MX[s, j]
+                rng = mx - mn
+                if rng > 0:
+                    v = X[i, j]
+                    if positive[j]:
+                        norm = (v - mn) / rng
+                    else:
+                        norm = (mx - v) / rng
+                    acc += norm * W[s, j]
+            out[i] = acc
+
+        return out
+
+    _entropy_weights = _entropy_weights_numba
+else:
+    _score_rows_numba = None
+    _entropy_weights = _entropy_weights_numpy
+
 
 class CHFEngine:
     # Define Indicators and their types
@@ -20,122 +297,103 @@ class CHFEngine:
 
     ALL_INDICATORS = POSITIVE_INDICATORS + NEGATIVE_INDICATORS
 
+    # Precomputed at class load: O(1) membership checks and a boolean mask
+    # aligned to ALL_INDICATORS that broadcasts over (n_rows, n_indicators)
+    # matrices in the normalization steps.
+    _POSITIVE_SET = frozenset(POSITIVE_INDICATORS)
+    _POSITIVE_MASK = np.isin(ALL_INDICATORS, POSITIVE_INDICATORS)
+
+    @staticmethod
+    def load_indicators(years, input_dir):
+        """
+        Loads indicator frames for the given years in one pass.
+
+        Returns a dict year -> DataFrame (missing years are omitted), meant
+        to be passed to both train_model and calculate_scores so the files
+        are parsed once per run instead of once per phase.
+        """
+        frames = {}
+        for year in years:
+            df = _read_indicators(input_dir, year)
+            if df is not None:
+                frames[year] = df
+        return frames
+
     @staticmethod
-    def train_model(training_years, input_dir, output_dir):
+    def train_model(training_years, input_dir, output_dir, indicator_frames=None):
         """
         Loads historic data, learns entropy weights, and saves model artifacts.
 
         Args:
             training_years (list): List of years (int) to use for training.
-            input_dir (str): Directory containing indicators_{year}.csv.
+            input_dir (str): Directory containing indicators_{year} files.
             output_dir (str): Directory to save model outputs.
+            indicator_frames (dict, optional): Pre-loaded year -> DataFrame
+                mapping (see load_indicators); skips re-reading from disk.
         """
         os.makedirs(output_dir, exist_ok=True)
 
         # 1. Load Data
         df_list = []
         for year in training_years:
-            filepath = os.path.join(input_dir, f'indicators_{year}.csv')
-            if os.path.exists(filepath):
-                df = pd.read_csv(filepath)
-                df['Year'] = year
+            if indicator_frames is not None and year in indicator_frames:
+                df = indicator_frames[year]
+            else:
+                df = _read_indicators(input_dir, year)
+
+            if df is not None:
                 df_list.append(df)
             else:
-                print(f"Warning: Data for {year} not found at {filepath}")
+                print(f"Warning: Data for {year} not found in {input_dir}")
 
         if not df_list:
             raise ValueError("No training data found.")
 
-        df_history = pd.concat(df_list, ignore_index=True)
-
-        # 2. Group by Strata
-        # We need to calculate weights PER STRATA.
-        unique_strata = df_history['Strata_ID'].unique()
-
-        weights_list = []
-        scaling_list = []
-
-        for strata in unique_strata:
-            df_strata = df_history[df_history['Strata_ID'] == strata].copy()
-
-            strata_weights = {'Strata_ID': strata}
-
-            # Temporary storage for Divergence to calculate final weights
-            divergences = {}
+        # Copy each year straight into a pre-allocated matrix instead of
+        # pd.concat, which would materialize a second full-history frame.
+        # Only the strata labels and the indicator matrix are needed.
+        n_ind = len(CHFEngine.ALL_INDICATORS)
+        total_rows = sum(len(df) for df in df_list)
 
-            # 3. Process Each Indicator
-            for indicator in CHFEngine.ALL_INDICATORS:
-                # Handle Missing Data: Fill with mean
-                if df_strata[indicator].isnull().any():
-                     df_strata[indicator] = df_strata[indicator].fillna(df_strata[indicator].mean())
+        X = np.empty((total_rows, n_ind), dtype=np.float32)
+        strata_col = np.empty(total_rows, dtype=object)
 
-                series = df_strata[indicator]
+        row = 0
+        for df in df_list:
+            k = len(df)
+            X[row:row + k] = df[CHFEngine.ALL_INDICATORS].to_numpy(dtype=np.float32)
+            strata_col[row:row + k] = df['Strata_ID'].to_numpy()
+            row += k
 
-                # Step A: Min/Max
-                min_val = series.min()
-                max_val = series.max()
-
-                # Save Scaling Factor
-                scaling_list.append({
-                    'Strata_ID': strata,
-                    'Indicator': indicator,
-                    'Min': min_val,
-                    'Max': max_val
-                })
-
-                # Zero Variance Check
-                if max_val == min_val:
-                    # Edge Case: Zero Variance -> Weight = 0
-                    divergences[indicator] = 0.0
-                    continue
-
-                # Normalize
-                if indicator in CHFEngine.POSITIVE_INDICATORS:
-                    normalized = (series - min_val) / (max_val - min_val)
-                else: # Negative
-                    normalized = (max_val - series) / (max_val - min_val)
-
-                # Step B: Probability (Pij)
-                total_norm = normalized.sum()
-                if total_norm == 0:
-                     divergences[indicator] = 0.0
-                     continue
-
-                probs = normalized / total_norm
-
-                # Step C: Entropy (Ej)
-                n = len(df_strata)
-                if n <= 1:
-                     divergences[indicator] = 0.0
-                     continue
-
-                k = 1 / np.log(n)
-
-                valid_probs = probs[probs > 0]
-                entropy_sum = np.sum(valid_probs * np.log(valid_probs))
-
-                ej = -k * entropy_sum
-
-                # Step D: Divergence (Dj)
-                dj = 1 - ej
-                divergences[indicator] = dj
+        # 2. Group by Strata
+        # We need to calculate weights PER STRATA.
+        # Sort so each strata occupies one contiguous block; the entropy math
+        # then runs as whole-matrix NumPy ufuncs with np.*.reduceat over the
+        # group offsets instead of a Python loop per (strata, indicator).
+        order = np.argsort(strata_col, kind='stable')
+        strata_col = strata_col[order]
+        X = X[order]
 
-            # Step E: Final Weights (wj)
-            total_divergence = sum(divergences.values())
+        unique_strata, offsets = np.unique(strata_col, return_index=True)
 
-            for indicator in CHFEngine.ALL_INDICATORS:
-                if total_divergence == 0:
-                    w = 0.0
-                else:
-                    w = divergences.get(indicator, 0.0) / total_divergence
+        n_strata = len(unique_strata)
+        offsets_ext = np.append(offsets, total_rows).astype(np.int64)
 
-                strata_weights[indicator] = w
+        positive = CHFEngine._POSITIVE_MASK
 
-            weights_list.append(strata_weights)
+        # 3. Entropy weights (Numba kernel when available, NumPy fallback)
+        W, mins, maxs = _entropy_weights(X, offsets_ext, positive)
 
         # 4. Save Outputs
-        df_weights = pd.DataFrame(weights_list)
-        df_scaling = pd.DataFrame(scaling_list)
+        df_weights = pd.DataFrame(W, columns=CHFEngine.ALL_INDICATORS)
+        df_weights.insert(0, 'Strata_ID', unique_strata)
+
+        df_scaling = pd.DataFrame({
+            'Strata_ID': np.repeat(unique_strata, n_ind),
+            'Indicator': np.tile(CHFEngine.ALL_INDICATORS, n_strata),
+            'Min': mins.ravel(),
+            'Max': maxs.ravel()
+        })
 
         weights_path = os.path.join(output_dir, 'strata_weights.csv')
         scaling_path = os.path.join(output_dir, 'scaling_factors.csv')
@@ -143,101 +401,141 @@ class CHFEngine:
         df_weights.to_csv(weights_path, index=False)
         df_scaling.to_csv(scaling_path, index=False)
 
+        # Dense binary artifacts for the scoring fast path: no CSV parse,
+        # no pivot, just array indexing keyed by the strata index.
+        np.save(os.path.join(output_dir, 'weights.npy'), W)
+        np.save(os.path.join(output_dir, 'minmax.npy'),
+                np.stack([mins, maxs], axis=-1))
+        with open(os.path.join(output_dir, 'strata_index.json'), 'w') as f:
+            json.dump({'strata': pd.Series(unique_strata).tolist(),
+                       'indicators': CHFEngine.ALL_INDICATORS}, f)
+
         print(f"Model trained successfully.")
         print(f"Weights saved to: {weights_path}")
         print(f"Scaling factors saved to: {scaling_path}")
 
     @staticmethod
-    def calculate_scores(years_list, input_dir, model_dir, output_dir):
+    def calculate_scores(years_list, input_dir, model_dir, output_dir, indicator_frames=None):
         """
         Applies learned weights to calculate CHF scores for all specified years.
 
         Args:
             years_list (list): List of years (int) to score.
-            input_dir (str): Directory containing indicators_{year}.csv.
-            model_dir (str): Directory containing strata_weights.csv and scaling_factors.csv.
+            input_dir (str): Directory containing indicators_{year} files.
+            model_dir (str): Directory containing the trained model artifacts.
             output_dir (str): Directory to save final scores.
+            indicator_frames (dict, optional): Pre-loaded year -> DataFrame
+                mapping (see load_indicators); skips re-reading from disk.
         """
         # Load Artifacts
+        # Fast path: the dense .npy arrays saved by train_model, memory-
+        # mapped and keyed by the strata index — no CSV parse, no pivot.
+        # The CSV artifacts remain as the fallback for older model dirs.
+        weights_npy = os.path.join(model_dir, 'weights.npy')
+        minmax_npy = os.path.join(model_dir, 'minmax.npy')
+        index_json = os.path.join(model_dir, 'strata_index.json')
+
         weights_path = os.path.join(model_dir, 'strata_weights.csv')
         scaling_path = os.path.join(model_dir, 'scaling_factors.csv')
 
-        if not os.path.exists(weights_path) or not os.path.exists(scaling_path):
+        if all(os.path.exists(p) for p in (weights_npy, minmax_npy, index_json)):
+            with open(index_json) as f:
+                index_meta = json.load(f)
+            strata_index = pd.Index(index_meta['strata'], name='Strata_ID')
+            indicators = index_meta['indicators']
+
+            W = np.load(weights_npy, mmap_mode='r')
+            MM = np.load(minmax_npy, mmap_mode='r')
+
+            weights_df = pd.DataFrame(W, index=strata_index, columns=indicators)
+            mins_wide = pd.DataFrame(MM[..., 0], index=strata_index,
+                                     columns=indicators).reindex(columns=CHFEngine.ALL_INDICATORS)
+            maxs_wide = pd.DataFrame(MM[..., 1], index=strata_index,
+                                     columns=indicators).reindex(columns=CHFEngine.ALL_INDICATORS)
+        elif os.path.exists(weights_path) and os.path.exists(scaling_path):
+            weights_df = pd.read_csv(weights_path).set_index('Strata_ID')
+
+            # Pivot the long scaling table into (Strata_ID x Indicator) wide
+            # frames once, so per-unit lookups become a single aligned reindex
+            # instead of O(N) DataFrame scans inside the strata loop.
+            scaling_df = pd.read_csv(scaling_path)
+            mins_wide = scaling_df.pivot(index='Strata_ID', columns='Indicator',
+                                         values='Min').reindex(columns=CHFEngine.ALL_INDICATORS)
+            maxs_wide = scaling_df.pivot(index='Strata_ID', columns='Indicator',
+                                         values='Max').reindex(columns=CHFEngine.ALL_INDICATORS)
+        else:
             raise FileNotFoundError("Model artifacts (weights/scaling) not found. Run training first.")
 
-        weights_df = pd.read_csv(weights_path)
-        scaling_df = pd.read_csv(scaling_path)
+        positive = CHFEngine._POSITIVE_MASK
+
+        # Dense model matrices, built once for all years. The Numba path
+        # indexes them per unit by strata row; the NumPy path expands them
+        # with a reindex per year.
+        weights_df = weights_df.reindex(columns=CHFEngine.ALL_INDICATORS)
+        W_arr = weights_df.to_numpy(dtype=np.float32)
+        MN_arr = mins_wide.to_numpy(dtype=np.float32)
+        MX_arr = maxs_wide.to_numpy(dtype=np.float32)
 
         results = []
 
         for year in years_list:
-            file_path = os.path.join(input_dir, f'indicators_{year}.csv')
-            if not os.path.exists(file_path):
+            if indicator_frames is not None and year in indicator_frames:
+                df = indicator_frames[year]
+            else:
+                df = _read_indicators(input_dir, year)
+
+            if df is None:
                  print(f"Warning: Data for {year} not found. Skipping.")
                  continue
 
-            df = pd.read_csv(file_path)
-
-            # Iterate through strata present in this year's data
-            for strata in df['Strata_ID'].unique():
-                # Filter units for this strata
-                df_strata = df[df['Strata_ID'] == strata].copy()
-
-                # Get Model Metadata
-                w_row = weights_df[weights_df['Strata_ID'] == strata]
-                s_rows = scaling_df[scaling_df['Strata_ID'] == strata]
-
-                if w_row.empty:
-                    print(f"Warning: No weights found for Strata {strata}. Skipping units.")
-                    continue
-
-                if s_rows.empty:
-                    print(f"Warning: No scaling factors found for Strata {strata}. Skipping units.")
-                    continue
-
-                # Initialize Scores
-                chf_scores = 0.0
-
-                for indicator in CHFEngine.ALL_INDICATORS:
-                    # Get Min/Max/Weight
-                    s_row = s_rows[s_rows['Indicator'] == indicator]
-                    if s_row.empty:
-                        # Should not happen if model is complete
-                        continue
-
-                    min_val = s_row.iloc[0]['Min']
-                    max_val = s_row.iloc[0]['Max']
-                    weight = w_row.iloc[0][indicator]
-
-                    # Skip if weight is 0 to save computation
-                    if weight == 0:
-                        continue
-
-                    # Handle Missing Data in Application Phase
-                    # If data is missing for a unit, we can fill with Historic Mean?
-                    # Or current Strata Mean?
-                    # Using current strata mean is safer for application.
-                    if df_strata[indicator].isnull().any():
-                        df_strata[indicator] = df_strata[indicator].fillna(df_strata[indicator].mean())
-
-                    series = df_strata[indicator]
-
-                    # Normalize
-                    # Safety check for Zero Variance (Min == Max)
-                    if max_val == min_val:
-                        normalized = 0.0
-                    else:
-                        if indicator in CHFEngine.POSITIVE_INDICATORS:
-                            normalized = (series - min_val) / (max_val - min_val)
-                        else: # Negative
-                            normalized = (max_val - series) / (max_val - min_val)
-
-                    # Add weighted component
-                    chf_scores += (normalized * weight)
-
-                df_strata['CHF_Score'] = chf_scores
-                # Keep relevant columns
-                results.append(df_strata[['Unit_ID', 'Strata_ID', 'CHF_Score']].assign(Year=year))
+            # Drop units whose strata have no trained model
+            known = df['Strata_ID'].isin(weights_df.index)
+            for strata in df.loc[~known, 'Strata_ID'].unique():
+                print(f"Warning: No weights found for Strata {strata}. Skipping units.")
+            df = df.loc[known]
+
+            if df.empty:
+                continue
+
+            # Sort so each strata is one contiguous block, then fill NaNs
+            # with the current strata mean in a single reduceat pass (same
+            # helper as training). Current-year means are safer here.
+            df = df.sort_values('Strata_ID', kind='mergesort', ignore_index=True)
+            _, offsets = np.unique(df['Strata_ID'].to_numpy(), return_index=True)
+            offsets_ext = np.append(offsets, len(df)).astype(np.int64)
+
+            X = df[CHFEngine.ALL_INDICATORS].to_numpy(dtype=np.float32)
+            X = _fill_group_means(X, offsets_ext)
+
+            strata_vals = df['Strata_ID']
+
+            if _score_rows_numba is not None:
+                # One cache-friendly sweep over X: normalize and weight-sum
+                # per row, model matrices indexed by strata row.
+                strata_idx = weights_df.index.get_indexer(strata_vals).astype(np.int64)
+                chf_scores = _score_rows_numba(X, strata_idx, W_arr,
+                                               MN_arr, MX_arr, positive)
+            else:
+                # Align model matrices to the unit rows in one shot
+                min_mat = mins_wide.reindex(strata_vals).to_numpy(dtype=np.float32)
+                max_mat = maxs_wide.reindex(strata_vals).to_numpy(dtype=np.float32)
+                w_mat = weights_df.reindex(strata_vals).to_numpy(dtype=np.float32)
+
+                # Normalize: zero-variance (or missing) ranges contribute 0,
+                # matching the old per-indicator safety check.
+                ranges = max_mat - min_mat
+                numer = np.where(positive, X - min_mat, max_mat - X)
+
+                norm = np.zeros_like(X)
+                np.divide(numer, ranges, out=norm, where=ranges > 0)
+
+                # Row-wise dot product in one fused call — no (n_units x
+                # n_indicators) product temporary before the reduction.
+                chf_scores = np.einsum('ij,ij->i', norm, w_mat)
+
+            df_out = df[['Unit_ID', 'Strata_ID']].copy()
+            df_out['CHF_Score'] = chf_scores
+            results.append(df_out.assign(Year=year))
 
         # Save Final Results
         if results:
